@@ -1,5 +1,6 @@
 from alpaca.utils import get_full_path
 from alpaca.logging import logger
+import functools
 import os
 import configparser
 
@@ -17,6 +18,9 @@ class Configuration:
         if config_file_path is not None:
             config.read(config_file_path, encoding="utf-8")
 
+        # Kept for the lazily evaluated path settings below
+        self._parser = config
+
         self.debug = config.getboolean("general", "debug", fallback="false")
         self.verbose = config.getboolean("general", "verbose", fallback="false")
 
@@ -36,24 +40,36 @@ class Configuration:
             "environment", "target_platform", fallback="aleya-linux-gnu"
         )
 
-        self.workspace_path = get_full_path(
-            config.get("environment", "workspace_path", fallback="~/alpaca_workspace")
+        self.c_flags = config.get("build", "c_flags", fallback="")
+        self.cpp_flags = config.get("build", "cpp_flags", fallback="")
+        self.ld_flags = config.get("build", "ld_flags", fallback="")
+        self.make_flags = config.get("build", "make_flags", fallback="")
+        self.ninja_flags = config.get("build", "ninja_flags", fallback="")
+
+    # The path settings are evaluated lazily; expanding and absolutizing them
+    # touches the environment and filesystem, which commands that never use
+    # the workspace or repositories should not pay for
+
+    @functools.cached_property
+    def workspace_path(self) -> str:
+        return get_full_path(
+            self._parser.get(
+                "environment", "workspace_path", fallback="~/alpaca_workspace"
+            )
         )
 
-        self.repositories = get_full_path(
-            config.get("repository", "repositories", fallback="~/packages")
+    @functools.cached_property
+    def repositories(self) -> list[str]:
+        return get_full_path(
+            self._parser.get("repository", "repositories", fallback="~/packages")
         ).split(",")
 
-        self.package_streams = config.get(
+    @functools.cached_property
+    def package_streams(self) -> list[str]:
+        return self._parser.get(
             "repository", "package_streams", fallback="core"
         ).split(",")
 
-        self.c_flags = config.get("build", "c_flags", fallback="")
-        self.cpp_flags = config.get("build", "cpp_flags", fallback="")
-        self.ld_flags = config.get("build", "ld_flags", fallback="")
-        self.make_flags = config.get("build", "make_flags", fallback="")
-        self.ninja_flags = config.get("build", "ninja_flags", fallback="")
-
     @staticmethod
     def _get_config_file_path() -> str:
         if os.environ.get("ALEYA_CONFIG") is not None:
@@ -94,4 +110,16 @@ class Configuration:
         raise FileNotFoundError("No configuration file found")
 
 
-config = Configuration()
+@functools.lru_cache(maxsize=1)
+def get_configuration() -> Configuration:
+    """
+    Get the shared configuration instance, parsing the configuration file
+    on first use only
+
+    Returns:
+        Configuration: The shared configuration instance
+    """
+    return Configuration()
+
+
+config = get_configuration()
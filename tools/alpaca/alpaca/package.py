@@ -6,7 +6,7 @@ from alpaca.utils import (
     is_url,
     is_file_path,
     download_file,
-    check_file_hash_from_string,
+    copy_file,
     check_file_hash_from_file,
     create_empty_directory,
     is_tarfile,
@@ -14,9 +14,9 @@ from alpaca.utils import (
     compress_tar,
     write_file_hash,
 )
+import concurrent.futures
 import hashlib
 import os
-import shutil
 
 
 class Package:
@@ -31,6 +31,21 @@ class Package:
         self.description: PackageDescription = PackageDescription.Load(atom_info, path)
         self.options: dict[str, bool] = {}
 
+        self._binary_hash_cache: dict[frozenset, str] = {}
+        self._environment_cache: dict[frozenset, dict[str, str]] = {}
+
+        # The working directory layout is fixed for the lifetime of a
+        # package, so the paths are joined once instead of on every access
+        self._workdir: str = os.path.join(
+            config.workspace_path,
+            self.description.atom.name,
+            f"{self.description.atom.version}-{self.description.atom.release}",
+        )
+        self._source_directory: str = os.path.join(self._workdir, "source")
+        self._build_directory: str = os.path.join(self._workdir, "build")
+        self._package_directory: str = os.path.join(self._workdir, "package")
+        self._artifact_directory: str = os.path.join(self._workdir, "artifacts")
+
     def print_info(self):
         """
         Print information about the package to the logger
@@ -64,8 +79,6 @@ class Package:
 
         logger.info(f"Building package {self.description.atom}...")
 
-        self._create_working_directories()
-
         if build_from_source:
             logger.info("Forcing build from source. Ignoring binary cache.")
 
@@ -73,6 +86,11 @@ class Package:
 
         artifact_file_path = self._get_binary_archive_path()
 
+        if not os.path.exists(artifact_file_path) and os.path.exists(
+            self._get_legacy_binary_archive_path()
+        ):
+            artifact_file_path = self._get_legacy_binary_archive_path()
+
         if not require_build:
             if os.path.exists(artifact_file_path):
                 logger.info("Binary cache found...")
@@ -86,58 +104,95 @@ class Package:
                 require_build = True
 
         if not require_build:
-            extract_tar(artifact_file_path, self._get_package_package_directory())
+            if self._is_binary_already_extracted(artifact_file_path):
+                logger.info("Package already extracted. Skipping extraction.")
+                return
+
+            self._prepare_extraction_directories()
+            extract_tar(artifact_file_path, self._package_directory)
+            self._write_installed_marker()
         else:
-            self._create_working_directories()
+            self._prepare_build_directories()
             self._handle_sources()
             self._handle_build()
             self._handle_check()
             self._handle_package()
 
-    def _get_package_workdir(self) -> str:
+    def _get_binary_archive_path(self) -> str:
         return os.path.join(
-            config.workspace_path,
-            self.description.atom.name,
-            f"{self.description.atom.version}-{self.description.atom.release}",
+            self._artifact_directory,
+            f"{self._compute_binary_hash()}.tar.zst",
         )
 
-    def _get_package_source_directory(self) -> str:
-        return os.path.join(self._get_package_workdir(), "source")
+    def _get_legacy_binary_archive_path(self) -> str:
+        # Binary caches written before the switch to zstd used .tar.xz;
+        # those remain readable so existing artifacts are not rebuilt
+        return os.path.join(
+            self._artifact_directory,
+            f"{self._compute_binary_hash()}.tar.xz",
+        )
 
-    def _get_package_build_directory(self) -> str:
-        return os.path.join(self._get_package_workdir(), "build")
+    def _get_installed_marker_path(self) -> str:
+        return os.path.join(
+            self._package_directory,
+            f".{self._compute_binary_hash()}.installed",
+        )
+
+    def _is_binary_already_extracted(self, artifact_file_path: str) -> bool:
+        """
+        Check if the binary archive was already extracted into the package directory.
+        The marker file is keyed on the binary hash, so a changed recipe or options
+        set invalidates it; an artifact newer than the marker invalidates it as well.
 
-    def _get_package_package_directory(self) -> str:
-        return os.path.join(self._get_package_workdir(), "package")
+        Args:
+            artifact_file_path (str): The path of the binary archive
 
-    def _get_package_artifact_directory(self) -> str:
-        return os.path.join(self._get_package_workdir(), "artifacts")
+        Returns:
+            bool: True if the package directory already holds this exact binary, False otherwise
+        """
 
-    def _get_binary_archive_path(self) -> str:
-        return os.path.join(
-            self._get_package_artifact_directory(),
-            f"{self._compute_binary_hash()}.tar.xz",
-        )
+        marker_path = self._get_installed_marker_path()
 
-    def _create_working_directories(self):
+        if not os.path.exists(marker_path):
+            return False
+
+        return os.path.getmtime(marker_path) >= os.path.getmtime(artifact_file_path)
+
+    def _write_installed_marker(self):
         """
-        Create the working directories for the package where needed.
-        This includes the source, build, package and artifact directories
+        Record that the binary archive was extracted into the package directory,
+        so the next install of the same binary can skip extraction entirely
+        """
+
+        with open(self._get_installed_marker_path(), "w") as file:
+            file.write(self._compute_binary_hash())
+
+    def _prepare_extraction_directories(self):
+        """
+        Create the working directories needed to extract a prebuilt binary.
+        The source and build directories are left untouched, so a binary cache hit
+        does not pay for removing a potentially large previous build tree
         """
-        package_workdir_base_path = self._get_package_workdir()
+        os.makedirs(self._workdir, exist_ok=True)
 
-        os.makedirs(package_workdir_base_path, exist_ok=True)
+        create_empty_directory(self._package_directory)
 
-        # Remove the source directory
-        if os.path.exists(self._get_package_source_directory()):
-            shutil.rmtree(self._get_package_source_directory())
+        # The artifact directory is not removed, as it is used to store the final packages
+        os.makedirs(self._artifact_directory, exist_ok=True)
 
-        create_empty_directory(self._get_package_source_directory())
-        create_empty_directory(self._get_package_build_directory())
-        create_empty_directory(self._get_package_package_directory())
+    def _prepare_build_directories(self):
+        """
+        Create the working directories for a full build from source.
+        This includes the source, build, package and artifact directories
+        """
+        os.makedirs(self._workdir, exist_ok=True)
+
+        create_empty_directory(self._source_directory)
+        create_empty_directory(self._build_directory)
+        create_empty_directory(self._package_directory)
 
         # The artifact directory is not removed, as it is used to store the final packages
-        os.makedirs(self._get_package_artifact_directory(), exist_ok=True)
+        os.makedirs(self._artifact_directory, exist_ok=True)
 
     def _handle_sources(self):
         """
@@ -147,17 +202,31 @@ class Package:
 
         logger.info("Handle sources...")
 
-        for i in range(len(self.description.sources)):
-            filename = self._download_source_file(
-                self.description.sources[i], self.description.sha256sums[i]
-            )
+        sources = self.description.sources
+
+        if len(sources) > 0:
+            # Downloads are network bound and hash verification releases the
+            # GIL inside OpenSSL, so the sources can be fetched and verified
+            # concurrently. Extraction stays serial since all archives unpack
+            # into the same source directory.
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(8, len(sources))
+            ) as executor:
+                futures = [
+                    executor.submit(self._download_source_file, source, sha256sum)
+                    for source, sha256sum in zip(
+                        sources, self.description.sha256sums
+                    )
+                ]
+                filenames = [future.result() for future in futures]
 
-            if is_tarfile(filename):
-                logger.info(f"Extracting file {os.path.basename(filename)}...")
-                extract_tar(filename, self._get_package_source_directory())
+            for filename in filenames:
+                if is_tarfile(filename):
+                    logger.info(f"Extracting file {os.path.basename(filename)}...")
+                    extract_tar(filename, self._source_directory)
 
         self._call_script_function(
-            "handle_sources", self._get_package_source_directory()
+            "handle_sources", self._source_directory
         )
 
     def _handle_build(self):
@@ -169,7 +238,7 @@ class Package:
         logger.info("Building package...")
         self._call_script_function(
             "handle_build",
-            self._get_package_build_directory(),
+            self._build_directory,
             print_output=not config.suppress_build_output,
         )
 
@@ -186,7 +255,7 @@ class Package:
         logger.info("Checking package...")
         self._call_script_function(
             "handle_check",
-            self._get_package_build_directory(),
+            self._build_directory,
             print_output=not config.suppress_build_output,
         )
 
@@ -199,16 +268,13 @@ class Package:
         logger.info("Packaging package...")
         self._call_script_function(
             "handle_package",
-            self._get_package_build_directory(),
+            self._build_directory,
             print_output=not config.suppress_build_output,
         )
 
-        output_archive_file = os.path.join(
-            self._get_package_artifact_directory(),
-            f"{self._compute_binary_hash()}.tar.xz",
-        )
+        output_archive_file = self._get_binary_archive_path()
 
-        compress_tar(self._get_package_package_directory(), output_archive_file)
+        compress_tar(self._package_directory, output_archive_file)
 
         write_file_hash(output_archive_file)
 
@@ -227,46 +293,51 @@ class Package:
             str: The full path to the downloaded file
         """
 
-        source_path = self._get_package_source_directory()
+        source_path = self._source_directory
 
         logger.info(f"Downloading source {source} to {source_path}")
 
+        # Hash while the bytes are transferred so the file does not need to
+        # be re-read from disk for verification afterwards
+        hasher = hashlib.sha256()
+
         # If the source is a URL
         if is_url(source):
             logger.verbose(f"Source {source} is a URL")
             download_file(
-                source, source_path, show_progress=config.show_download_progress
+                source,
+                source_path,
+                show_progress=config.show_download_progress,
+                hasher=hasher,
             )
-        # If not, check if it is a full path
-        elif is_file_path(source):
-            logger.verbose(f"Source {source} is a direct path")
-            shutil.copy(source, source_path)
-        # If not, look relative to the package directory
-        elif is_file_path(
-            os.path.join(self.description.get_recipe_directory(), source)
-        ):
-            logger.verbose(f"Source {source} is relative to the recipe directory")
-            shutil.copy(os.path.join(self.description.get_recipe_directory(), source), source_path)
-        # If not, look relative to all the repositories, in order
         else:
-            found = False
-            for repo in config.repositories:
-                repo_path = os.path.join(repo, source)
-                if is_file_path(repo_path):
-                    logger.verbose(
-                        f"Source {source} is relative to the repository {repo}"
-                    )
-                    shutil.copy(repo_path, source_path)
-                    found = True
-                    break
+            # Resolve local sources in one pass, with a single stat per
+            # candidate: the direct path first, then relative to the recipe
+            # directory, then relative to each repository in order
+            candidates = [
+                source,
+                os.path.join(self.description.get_recipe_directory(), source),
+            ]
+            candidates.extend(
+                os.path.join(repo, source) for repo in config.repositories
+            )
 
-            if not found:
+            for candidate in candidates:
+                if is_file_path(candidate):
+                    logger.verbose(f"Source {source} resolved to {candidate}")
+                    copy_file(candidate, source_path, hasher=hasher)
+                    break
+            else:
                 raise ValueError(f"Source {source} is not a valid URL or file path")
 
         file_path = os.path.join(source_path, os.path.basename(source))
 
-        # Check the hash of the file
-        if not check_file_hash_from_string(file_path, sha256sum):
+        # Check the hash computed during the transfer
+        file_hash = hasher.hexdigest()
+        if file_hash != sha256sum:
+            logger.error(
+                f"File {file_path} has hash {file_hash}, expected {sha256sum}. File may be corrupt."
+            )
             raise ValueError(f"Source {source} hash mismatch. Expected {sha256sum}")
 
         return file_path
@@ -302,19 +373,24 @@ class Package:
         """
         Create a dictionary of environment variables to pass to the package script
 
+        The dictionary is memoized per options set, since it is constant for a
+        given build but requested for every script function invocation.
+
         Returns:
             dict[str, str]: A dictionary of environment variables to be passed to the package script
         """
 
-        env = {}
+        cache_key = frozenset(self.options.items())
 
-        for key in self.options.keys():
-            env[f"option_{key.lower()}"] = "1"
+        if cache_key in self._environment_cache:
+            return self._environment_cache[cache_key]
 
-        env["working_directory"] = self._get_package_workdir()
-        env["source_directory"] = self._get_package_source_directory()
-        env["build_directory"] = self._get_package_build_directory()
-        env["package_directory"] = self._get_package_package_directory()
+        env = {f"option_{key.lower()}": "1" for key in self.options}
+
+        env["working_directory"] = self._workdir
+        env["source_directory"] = self._source_directory
+        env["build_directory"] = self._build_directory
+        env["package_directory"] = self._package_directory
         env["target_architecture"] = config.target_architecture
         env["target_platform"] = config.target_platform
         env["package_atom"] = str(self.description.atom)
@@ -327,6 +403,7 @@ class Package:
         env["make_flags"] = config.make_flags
         env["ninja_flags"] = config.ninja_flags
 
+        self._environment_cache[cache_key] = env
         return env
 
     def _compute_binary_hash(self) -> str:
@@ -334,19 +411,26 @@ class Package:
         Compute a hash of the package script and options to determine if a prebuilt binary is available
         This can be used to skip building from source if the binary is already available
 
+        The hash is memoized per options set, since it is requested several times during a build
+        and the recipe file does not change within the lifetime of a package.
+
         Returns:
             str: The hash of the package script and options
         """
 
-        with open(self.description.recipe_path, "r") as file:
-            package_script = file.read()
+        cache_key = frozenset(self.options.items())
+
+        if cache_key in self._binary_hash_cache:
+            return self._binary_hash_cache[cache_key]
 
         hash_object = hashlib.sha256()
-        hash_object.update(package_script.encode("utf-8"))
+        hash_object.update(self.description.recipe_bytes)
         hash_object.update(config.target_architecture.encode("utf-8"))
 
         for key in sorted(self.options.keys()):
             hash_object.update(key.encode("utf-8"))
             hash_object.update(str(self.options[key]).encode("utf-8"))
 
-        return hash_object.hexdigest()
+        binary_hash = hash_object.hexdigest()
+        self._binary_hash_cache[cache_key] = binary_hash
+        return binary_hash
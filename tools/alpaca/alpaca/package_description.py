@@ -26,6 +26,7 @@ class PackageDescription:
         sha256sums: list[str],
         available_options: list[str],
         recipe_path: str,
+        recipe_bytes: bytes,
     ):
         self.atom = atom
         self.url = url
@@ -36,6 +37,7 @@ class PackageDescription:
         self.sha256sums = sha256sums
         self.available_options = available_options
         self.recipe_path = recipe_path
+        self.recipe_bytes = recipe_bytes
 
         if len(sources) != len(sha256sums):
             raise ValueError(
@@ -63,6 +65,11 @@ class PackageDescription:
     def Load(atom_info: Atom, path: str) -> "PackageDescription":
         logger.debug(f"Loading package description from {path}")
 
+        # The recipe contents are kept in memory so consumers (such as the
+        # binary hash computation) do not have to re-read the file
+        with open(path, "rb") as file:
+            recipe_bytes = file.read()
+
         env = PackageDescription._get_environment_variables(atom_info)
 
         url = PackageDescription._read_package_variable(path, "url", env)
@@ -101,6 +108,7 @@ class PackageDescription:
             sha256sums,
             available_options,
             path,
+            recipe_bytes,
         )
 
     @staticmethod
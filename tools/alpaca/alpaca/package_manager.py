@@ -2,12 +2,36 @@ from alpaca.package import Package
 from alpaca.package_description import Atom
 from alpaca.configuration import config
 from alpaca.logging import logger
+import functools
 import os
 
 
 _LATEST_VERSION_IDENTIFIER = "latest"
 
 
+@functools.lru_cache(maxsize=None)
+def _list_recipe_files(recipe_directory: str) -> dict[str, str]:
+    """
+    List all files in a package recipe directory as a name-to-path mapping
+
+    The result is cached, so resolving many packages during a dependency
+    walk costs one directory scan per repository/stream/package instead of
+    a stat call per candidate file name.
+
+    Args:
+        recipe_directory (str): The recipe directory to scan
+
+    Returns:
+        dict[str, str]: A mapping of file name to full path; empty if the directory does not exist
+    """
+
+    if not os.path.isdir(recipe_directory):
+        return {}
+
+    with os.scandir(recipe_directory) as entries:
+        return {entry.name: entry.path for entry in entries if entry.is_file()}
+
+
 class PackageManager:
     def __init__(self):
         self.packages: dict[str, Package] = {}
@@ -21,25 +45,28 @@ class PackageManager:
             logger.verbose(f"Package {atom} loaded from cache")
             return self.packages[atom]
 
+        candidate_names = (
+            f"{atom.name}-{atom.version}.sh",
+            f"{atom.name}-{atom.version}-{atom.release}.sh",
+        )
+
         for repo in config.repositories:
             logger.verbose(f"Searching for package {atom} in {repo}")
 
             for stream in config.package_streams:
-                recipe_path = f"{repo}/{stream}/recipes/{atom.name}/{atom.name}-{atom.version}.sh"
-                recipe_path2 = f"{repo}/{stream}/recipes/{atom.name}/{atom.name}-{atom.version}-{atom.release}.sh"
+                recipe_files = _list_recipe_files(
+                    f"{repo}/{stream}/recipes/{atom.name}"
+                )
 
-                if os.path.exists(recipe_path):
-                    logger.verbose(f"Found package {atom} in {recipe_path}")
+                for candidate_name in candidate_names:
+                    recipe_path = recipe_files.get(candidate_name)
 
-                    package = Package(atom, recipe_path)
-                    self._add_package_to_cache(atom, package)
-                    return package
-                elif os.path.exists(recipe_path2):
-                    logger.verbose(f"Found package {atom} in {recipe_path2}")
+                    if recipe_path is not None:
+                        logger.verbose(f"Found package {atom} in {recipe_path}")
 
-                    package = Package(atom, recipe_path2)
-                    self._add_package_to_cache(atom, package)
-                    return package
+                        package = Package(atom, recipe_path)
+                        self._add_package_to_cache(atom, package)
+                        return package
 
         if throw_on_failure:
             raise ValueError(f"Package {package_atom} not found in any repository")
@@ -88,9 +115,11 @@ class PackageManager:
 
         for repo in config.repositories:
             for stream in config.package_streams:
-                latest_info_path = f"{repo}/{stream}/recipes/{package_name}/{_LATEST_VERSION_IDENTIFIER}"
+                latest_info_path = _list_recipe_files(
+                    f"{repo}/{stream}/recipes/{package_name}"
+                ).get(_LATEST_VERSION_IDENTIFIER)
 
-                if os.path.exists(latest_info_path):
+                if latest_info_path is not None:
                     with open(latest_info_path, "r") as f:
                         result = f.read().strip()
                         logger.info(f"Latest version for package {package_name} is {result}")
@@ -1,10 +1,11 @@
 from alpaca.logging import logger
 import subprocess
-import threading
+import selectors
 import os
-import io
 import sys
-import typing
+
+
+_PIPE_READ_CHUNK_SIZE = 64 * 1024
 
 
 class ShellCommandResult:
@@ -15,20 +16,6 @@ class ShellCommandResult:
 
 
 class ShellCommand:
-    @staticmethod
-    def _stream_output(
-        stream,
-        print_output: bool,
-        outputString: io.StringIO,
-        destination: typing.TextIO,
-    ):
-        for line in iter(stream.readline, ""):
-            if print_output:
-                print(line, end="", file=destination)
-            outputString.write(line)
-
-        stream.close()
-
     @staticmethod
     def exec(
         command: str,
@@ -50,52 +37,71 @@ class ShellCommand:
             tuple[str, str]: A tuple containing the stdout and stderr output of the command
         """
 
-        env = os.environ.copy()
-
+        # A single dict merge instead of a copy followed by an update
         if environment is not None:
-            env.update(environment)
+            env = {**os.environ, **environment}
+        else:
+            env = os.environ.copy()
 
         process = subprocess.Popen(
             ["bash", "-c", command],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-            universal_newlines=True,
             cwd=working_directory,
             env=env,
         )
 
-        stdout_str = io.StringIO()
-        stderr_str = io.StringIO()
+        stdout_buffer = bytearray()
+        stderr_buffer = bytearray()
 
-        stdout_thread = threading.Thread(
-            target=ShellCommand._stream_output,
-            args=(process.stdout, print_output, stdout_str, sys.stdout),
-        )
-        stderr_thread = threading.Thread(
-            target=ShellCommand._stream_output,
-            args=(process.stderr, print_output, stderr_str, sys.stderr),
-        )
+        # A single selector polling both pipes replaces the former
+        # thread-per-stream pump; no thread startup cost per command and no
+        # GIL ping-pong while the build is quiet
+        selector = selectors.DefaultSelector()
 
-        stdout_thread.start()
-        stderr_thread.start()
+        # Raw bytes are accumulated per stream and decoded once at the end;
+        # mirroring to the terminal bypasses the text layer entirely, so no
+        # per-line Python calls or codec work happen while the build runs
+        streams = {
+            process.stdout: (stdout_buffer, sys.stdout),
+            process.stderr: (stderr_buffer, sys.stderr),
+        }
 
-        error_code = process.wait()
+        for stream in streams:
+            selector.register(stream, selectors.EVENT_READ)
 
-        sys.stdout.flush()
-        sys.stderr.flush()
+        while streams:
+            for key, _ in selector.select():
+                stream = key.fileobj
+                chunk = os.read(stream.fileno(), _PIPE_READ_CHUNK_SIZE)
 
-        stdout_thread.join()
-        stderr_thread.join()
+                if not chunk:
+                    selector.unregister(stream)
+                    stream.close()
+                    del streams[stream]
+                    continue
+
+                buffer, destination = streams[stream]
+                buffer += chunk
+
+                if print_output:
+                    destination.buffer.write(chunk)
+                    destination.buffer.flush()
+
+        selector.close()
+
+        error_code = process.wait()
+
+        # Build tools occasionally emit invalid UTF-8; replace such bytes
+        # instead of failing the whole command
+        stdout = bytes(stdout_buffer).decode("utf-8", errors="replace")
+        stderr = bytes(stderr_buffer).decode("utf-8", errors="replace")
 
         if throw_on_error and error_code != 0:
-            logger.fatal(stderr_str.getvalue())
+            logger.fatal(stderr)
             raise Exception(f"Command failed with error code {error_code}.")
 
-        return ShellCommandResult(
-            error_code, stdout_str.getvalue(), stderr_str.getvalue()
-        )
+        return ShellCommandResult(error_code, stdout, stderr)
 
     @staticmethod
     def exec_get_value(
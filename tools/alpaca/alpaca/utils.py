@@ -3,12 +3,66 @@ from numbers import Number
 from urllib.parse import urlparse
 import urllib.request
 import hashlib
+import io
+import lzma
+import mmap
+import subprocess
 import tarfile
 import shutil
 import os
 import sys
 
 
+# Buffer sizes for the pure-Python archive paths: a large buffer on the raw
+# archive side keeps syscalls rare, a second one on the decompressed side
+# shields liblzma from tarfile's many small reads and writes
+_ARCHIVE_FILE_BUFFER_SIZE = 4 * 1024 * 1024
+_TAR_STREAM_BUFFER_SIZE = 1024 * 1024
+
+
+_MMAP_HASH_THRESHOLD = 64 * 1024 * 1024
+
+_TRANSFER_CHUNK_SIZE = 64 * 1024
+
+
+def _has_system_xz_tar() -> bool:
+    """
+    Check if the system xz and tar binaries are available
+
+    Returns:
+        bool: True if both xz and tar can be found on the path, False otherwise
+    """
+    return shutil.which("xz") is not None and shutil.which("tar") is not None
+
+
+def _has_system_zstd_tar() -> bool:
+    """
+    Check if the system zstd and tar binaries are available
+
+    Returns:
+        bool: True if both zstd and tar can be found on the path, False otherwise
+    """
+    return shutil.which("zstd") is not None and shutil.which("tar") is not None
+
+
+def _get_zstandard_module():
+    """
+    Import the zstandard module, raising a descriptive error when it is not installed
+
+    Returns:
+        module: The zstandard module
+    """
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(
+            "Handling .tar.zst archives requires either the system zstd binary "
+            "or the zstandard Python module"
+        )
+
+    return zstandard
+
+
 def get_full_path(path: str) -> str:
     """
     Get the full absolute path of a file or directory, expanding environment variables and user home directories
@@ -44,6 +98,9 @@ def show_progress_bar(current: Number, total: Number, bar_length: int = 40) -> s
         sys.stdout.flush()
 
 
+_URL_SCHEME_PREFIXES = ("http://", "https://", "ftp://", "file://")
+
+
 def is_url(url: str) -> bool:
     """
     Check if a string is a URL
@@ -54,6 +111,15 @@ def is_url(url: str) -> bool:
     Returns:
         bool: True if the string is a URL, False otherwise
     """
+
+    # Common schemes are recognized with a plain prefix check; only strings
+    # that still contain a scheme separator go through the full parser
+    if url.startswith(_URL_SCHEME_PREFIXES):
+        return True
+
+    if "://" not in url:
+        return False
+
     return urlparse(url).scheme != ""
 
 
@@ -70,7 +136,12 @@ def is_file_path(path: str) -> bool:
     return os.path.isfile(path)
 
 
-def download_file(url: str, destination_dir: str, show_progress: bool = True) -> str:
+def download_file(
+    url: str,
+    destination_dir: str,
+    show_progress: bool = True,
+    hasher: "hashlib._Hash | None" = None,
+) -> str:
     """
     Download a file from a URL to a destination directory
 
@@ -78,6 +149,8 @@ def download_file(url: str, destination_dir: str, show_progress: bool = True) ->
         url (str): The URL of the file to download
         destination_dir (str): The directory to save the file to
         show_progress (bool, optional): Whether to show a progress bar while downloading. Defaults to True.
+        hasher (hashlib._Hash, optional): A hash object to update with the downloaded bytes,
+            so the file does not need to be re-read for verification. Defaults to None.
 
     Returns:
         str: The name of the downloaded file
@@ -87,21 +160,53 @@ def download_file(url: str, destination_dir: str, show_progress: bool = True) ->
     file_name = os.path.basename(parsed_url.path)
     destination_path = os.path.join(destination_dir, file_name)
 
-    urllib.request.urlretrieve(
-        url,
-        destination_path,
-        reporthook=lambda block_num, block_size, total_size: (
-            show_progress_bar(block_num * block_size, total_size)
-            if show_progress
-            else None
-        ),
-    )
-
-    # Hack; the reporthook doesn't report the final block, so we need to print the final progress
-    if show_progress:
-        show_progress_bar(
-            os.path.getsize(destination_path), os.path.getsize(destination_path)
-        )
+    with urllib.request.urlopen(url) as response:
+        total_size = int(response.headers.get("Content-Length", 0))
+        downloaded = 0
+
+        with open(destination_path, "wb") as file:
+            while chunk := response.read(_TRANSFER_CHUNK_SIZE):
+                file.write(chunk)
+
+                if hasher is not None:
+                    hasher.update(chunk)
+
+                downloaded += len(chunk)
+
+                if show_progress and total_size > 0:
+                    show_progress_bar(downloaded, total_size)
+
+    return file_name
+
+
+def copy_file(
+    source_path: str,
+    destination_dir: str,
+    hasher: "hashlib._Hash | None" = None,
+) -> str:
+    """
+    Copy a file to a destination directory
+
+    Args:
+        source_path (str): The path of the file to copy
+        destination_dir (str): The directory to copy the file to
+        hasher (hashlib._Hash, optional): A hash object to update with the copied bytes,
+            so the file does not need to be re-read for verification. Defaults to None.
+
+    Returns:
+        str: The name of the copied file
+    """
+
+    file_name = os.path.basename(source_path)
+    destination_path = os.path.join(destination_dir, file_name)
+
+    with open(source_path, "rb") as source:
+        with open(destination_path, "wb") as destination:
+            while chunk := source.read(_TRANSFER_CHUNK_SIZE):
+                destination.write(chunk)
+
+                if hasher is not None:
+                    hasher.update(chunk)
 
     return file_name
 
@@ -130,7 +235,14 @@ def get_file_hash(path: str) -> str:
         str: The sha256 hash of the file
     """
     with open(path, "rb") as file:
-        return hashlib.sha256(file.read()).hexdigest()
+        # For large files (source tarballs, binary cache artifacts) hand the
+        # whole mapping to OpenSSL in one call; for anything smaller let
+        # file_digest run its C-level read loop with the GIL released
+        if os.path.getsize(path) >= _MMAP_HASH_THRESHOLD:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.sha256(mapped).hexdigest()
+
+        return hashlib.file_digest(file, "sha256").hexdigest()
 
 
 def write_file_hash(path: str):
@@ -220,15 +332,95 @@ def extract_tar(file_path: str, destination_dir: str):
 
     logger.verbose(f"Extracting {file_path} to {destination_dir}...")
 
-    with tarfile.open(file_path, "r") as tar:
-        tar.extractall(destination_dir)
+    if file_path.endswith(".tar.zst") or file_path.endswith(".tzst"):
+        _extract_tar_zstd(file_path, destination_dir)
+    elif file_path.endswith(".tar.xz") or file_path.endswith(".txz"):
+        _extract_tar_xz(file_path, destination_dir)
+    else:
+        with tarfile.open(file_path, "r") as tar:
+            tar.extractall(destination_dir)
 
     logger.verbose(f"File {file_path} extracted to {destination_dir}")
 
 
+def _extract_tar_xz(file_path: str, destination_dir: str):
+    """
+    Extract a .tar.xz archive to a destination directory
+
+    Args:
+        file_path (str): The path of the archive to extract
+        destination_dir (str): The directory to extract the archive to
+    """
+
+    # Prefer the system xz binary; it decompresses multi-threaded with -T0
+    # while the Python lzma module is limited to a single core
+    if _has_system_xz_tar():
+        subprocess.run(
+            [
+                "tar",
+                "--use-compress-program",
+                "xz -T0 -d",
+                "-xf",
+                file_path,
+                "-C",
+                destination_dir,
+            ],
+            check=True,
+        )
+        return
+
+    # Decompress through large buffered readers on both sides of the xz
+    # codec and a non-seekable tar stream; seeking in an xz archive forces
+    # a full re-decode, and unbuffered reads into liblzma are very slow
+    with open(file_path, "rb", buffering=0) as raw_file:
+        compressed = io.BufferedReader(
+            raw_file, buffer_size=_ARCHIVE_FILE_BUFFER_SIZE
+        )
+        xz_file = lzma.LZMAFile(compressed, "rb")
+        decompressed = io.BufferedReader(
+            xz_file, buffer_size=_TAR_STREAM_BUFFER_SIZE
+        )
+
+        with tarfile.open(fileobj=decompressed, mode="r|") as tar:
+            tar.extractall(destination_dir)
+
+
+def _extract_tar_zstd(file_path: str, destination_dir: str):
+    """
+    Extract a .tar.zst archive to a destination directory
+
+    Args:
+        file_path (str): The path of the archive to extract
+        destination_dir (str): The directory to extract the archive to
+    """
+
+    if _has_system_zstd_tar():
+        subprocess.run(
+            [
+                "tar",
+                "--use-compress-program",
+                "zstd -T0 -d",
+                "-xf",
+                file_path,
+                "-C",
+                destination_dir,
+            ],
+            check=True,
+        )
+        return
+
+    zstandard = _get_zstandard_module()
+
+    with open(file_path, "rb") as file:
+        with zstandard.ZstdDecompressor().stream_reader(file) as reader:
+            with tarfile.open(fileobj=reader, mode="r|") as tar:
+                tar.extractall(destination_dir)
+
+
 def compress_tar(directory: str, archive_path: str):
     """
-    Compress a directory to a tar.xz archive
+    Compress a directory to a tar archive. The compression codec is chosen
+    from the archive file extension (.tar.zst or .tar.xz)
 
     Args:
         directory (str): The source directory to archive
@@ -237,13 +429,85 @@ def compress_tar(directory: str, archive_path: str):
 
     logger.verbose(f"Archiving directory {directory} to {archive_path}...")
 
-    files = []
-    for root, _, filenames in os.walk(directory):
-        for filename in filenames:
-            files.append(os.path.join(root, filename))
-
-    with tarfile.open(archive_path, "w:xz") as tar:
-        for file in files:
-            tar.add(file, arcname=os.path.relpath(file, directory))
+    if archive_path.endswith(".tar.zst") or archive_path.endswith(".tzst"):
+        _compress_tar_zstd(directory, archive_path)
+    else:
+        _compress_tar_xz(directory, archive_path)
 
     logger.verbose(f"Directory {directory} archived to {archive_path}")
+
+
+def _compress_tar_xz(directory: str, archive_path: str):
+    """
+    Compress a directory to a .tar.xz archive
+
+    Args:
+        directory (str): The source directory to archive
+        archive_path (str): The path of the target archive
+    """
+
+    # Prefer the system xz binary; it compresses multi-threaded with -T0
+    # while the Python lzma module is limited to a single core
+    if _has_system_xz_tar():
+        subprocess.run(
+            [
+                "tar",
+                "--use-compress-program",
+                # The explicit block size guarantees a multi-block stream even
+                # on machines with few cores, so any consumer can later decode
+                # the archive block-parallel with xz -T0
+                "xz -T0 -c --block-size=16MiB",
+                "-cf",
+                archive_path,
+                "-C",
+                directory,
+                ".",
+            ],
+            check=True,
+        )
+        return
+
+    # Pipe the tar stream straight into the xz encoder; the non-seekable w|
+    # mode guarantees a single sequential pass with no intermediate tarball,
+    # and the large buffered writer keeps syscalls on the archive file rare
+    with open(archive_path, "wb", buffering=0) as raw_file:
+        with io.BufferedWriter(
+            raw_file, buffer_size=_ARCHIVE_FILE_BUFFER_SIZE
+        ) as buffered:
+            with lzma.open(buffered, "wb", format=lzma.FORMAT_XZ) as xz_file:
+                with tarfile.open(fileobj=xz_file, mode="w|") as tar:
+                    tar.add(directory, arcname=".")
+
+
+def _compress_tar_zstd(directory: str, archive_path: str):
+    """
+    Compress a directory to a .tar.zst archive
+
+    Args:
+        directory (str): The source directory to archive
+        archive_path (str): The path of the target archive
+    """
+
+    if _has_system_zstd_tar():
+        subprocess.run(
+            [
+                "tar",
+                "--use-compress-program",
+                "zstd -T0 -19",
+                "-cf",
+                archive_path,
+                "-C",
+                directory,
+                ".",
+            ],
+            check=True,
+        )
+        return
+
+    zstandard = _get_zstandard_module()
+
+    with open(archive_path, "wb") as file:
+        compressor = zstandard.ZstdCompressor(level=19, threads=-1)
+        with compressor.stream_writer(file) as stream:
+            with tarfile.open(fileobj=stream, mode="w|") as tar:
+                tar.add(directory, arcname=".")